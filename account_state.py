@@ -0,0 +1,85 @@
+import asyncio
+import time
+
+class AccountStateCache:
+    def __init__(self, exchange, currency="USDT", refresh_interval=5, max_age=30):
+        self.exchange = exchange
+        self.currency = currency
+        self.refresh_interval = refresh_interval
+        self.max_age = max_age  # default staleness limit for pre-trade reads, in seconds
+        self.total = None
+        self.free = None
+        self.updated_at = None  # time.monotonic() of the last snapshot or optimistic update
+        self.last_error = None
+        self._fill_seq = 0  # bumped by apply_fill so in-flight snapshots taken before a fill are dropped
+        self._task = None
+
+    async def refresh(self):
+        """
+        Replace the cached balance with a fresh exchange snapshot.
+        A snapshot requested before one of our own fills landed is discarded, as it would undo apply_fill.
+        """
+        seq = self._fill_seq
+        try:
+            balance = await self.exchange.fetch_balance()
+        except Exception as e:
+            self.last_error = e
+            print(f"Error refreshing balance: {e}")
+            return False
+        if seq != self._fill_seq:
+            return False
+        total = balance.get("total", {}).get(self.currency)
+        if total is None:
+            self.last_error = KeyError(f"{self.currency} missing from balance snapshot")
+            print(f"Error refreshing balance: {self.last_error}")
+            return False
+        self.total = total
+        self.free = balance.get("free", {}).get(self.currency)
+        self.updated_at = time.monotonic()
+        self.last_error = None
+        return True
+
+    async def run(self):
+        # Callers await refresh() once before start() so the cache is warm before the first signal
+        while True:
+            await asyncio.sleep(self.refresh_interval)
+            await self.refresh()
+
+    def start(self):
+        if self._task is None:
+            self._task = asyncio.create_task(self.run())
+        return self._task
+
+    def stop(self):
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    def apply_fill(self, realized_pnl=0.0, margin_delta=0.0):
+        """
+        Optimistically apply one of our own fills until the next snapshot confirms it.
+        realized_pnl changes both total and free; margin_delta (negative when margin is locked) only free.
+        """
+        if self.total is None:
+            return
+        self._fill_seq += 1
+        self.total += realized_pnl
+        if self.free is not None:
+            self.free += realized_pnl + margin_delta
+        self.updated_at = time.monotonic()
+
+    def staleness(self):
+        """Seconds since the cache was last updated, None if it never was."""
+        if self.updated_at is None:
+            return None
+        return time.monotonic() - self.updated_at
+
+    def balance(self, max_age=None):
+        """
+        Cached total balance, or None if older than max_age seconds (default self.max_age).
+        """
+        if self.updated_at is None:
+            return None
+        if time.monotonic() - self.updated_at > (self.max_age if max_age is None else max_age):
+            return None
+        return self.total
@@ -0,0 +1,151 @@
+import asyncio
+import socket
+import time
+import aiohttp
+import numpy as np
+from collections import deque
+
+class ExchangeConnectionManager:
+    def __init__(self, warm_url, pool_size=10, warm_connections=2, keepalive_timeout=60,
+                 dns_ttl=300, ping_interval=20, ssl_context=None):
+        self.warm_url = warm_url  # cheap endpoint used for pre-warm and keep-alive pings
+        self.pool_size = pool_size
+        self.warm_connections = warm_connections
+        self.keepalive_timeout = keepalive_timeout
+        self.dns_ttl = dns_ttl
+        self.ping_interval = ping_interval
+        self.ssl_context = ssl_context
+        self.session = None
+        self._keepalive_task = None
+
+        # Connection metrics
+        self.handshake_ms = deque(maxlen=200)  # DNS + TCP + TLS time of each new connection
+        self.connections_created = 0
+        self.connections_reused = 0
+        self.dns_cache_hits = 0
+        self.dns_cache_misses = 0
+        self.requests = 0
+        self.last_activity = None
+
+    def _trace_config(self):
+        trace = aiohttp.TraceConfig()
+
+        async def on_connection_create_start(session, ctx, params):
+            ctx.conn_start = time.perf_counter()
+
+        async def on_connection_create_end(session, ctx, params):
+            self.connections_created += 1
+            self.handshake_ms.append((time.perf_counter() - ctx.conn_start) * 1000)
+
+        async def on_connection_reuseconn(session, ctx, params):
+            self.connections_reused += 1
+
+        async def on_dns_cache_hit(session, ctx, params):
+            self.dns_cache_hits += 1
+
+        async def on_dns_cache_miss(session, ctx, params):
+            self.dns_cache_misses += 1
+
+        async def on_request_end(session, ctx, params):
+            self.requests += 1
+            self.last_activity = time.monotonic()
+
+        trace.on_connection_create_start.append(on_connection_create_start)
+        trace.on_connection_create_end.append(on_connection_create_end)
+        trace.on_connection_reuseconn.append(on_connection_reuseconn)
+        trace.on_dns_cache_hit.append(on_dns_cache_hit)
+        trace.on_dns_cache_miss.append(on_dns_cache_miss)
+        trace.on_request_end.append(on_request_end)
+        return trace
+
+    async def start(self, exchange=None):
+        """
+        Create the pooled session, hand it to the ccxt exchange, pre-warm connections
+        and start the keep-alive pinger. Must be called from inside the running loop.
+        TLS trust roots, certificate verification and proxy-from-environment come from the
+        exchange's own settings (cafile, verify, aiohttp_trust_env), as in ccxt's default session.
+        """
+        if self.session is None:
+            ssl_context = self.ssl_context
+            trust_env = False
+            if exchange is not None:
+                # ccxt leaves a session passed in from outside open after exchange.close(); we own it.
+                # With own_session off, open() only builds ccxt's SSL context (certifi cafile / verify).
+                exchange.own_session = False
+                exchange.open()
+                if ssl_context is None:
+                    ssl_context = exchange.ssl_context
+                trust_env = exchange.aiohttp_trust_env
+            connector = aiohttp.TCPConnector(
+                limit=self.pool_size,
+                limit_per_host=self.pool_size,
+                keepalive_timeout=self.keepalive_timeout,
+                use_dns_cache=True,
+                ttl_dns_cache=self.dns_ttl,
+                enable_cleanup_closed=True,
+                family=socket.AF_UNSPEC,
+                happy_eyeballs_delay=0,
+                ssl=ssl_context if ssl_context is not None else True,
+            )
+            self.session = aiohttp.ClientSession(
+                connector=connector, trust_env=trust_env, trace_configs=[self._trace_config()]
+            )
+        if exchange is not None:
+            exchange.session = self.session
+        await self.prewarm()
+        if self._keepalive_task is None:
+            self._keepalive_task = asyncio.create_task(self.keepalive())
+
+    async def _ping(self):
+        try:
+            async with self.session.get(self.warm_url) as resp:
+                await resp.read()
+            return True
+        except Exception as e:
+            print(f"Connection pre-warm failed: {e}")
+            return False
+
+    async def prewarm(self):
+        """
+        Open `warm_connections` connections concurrently so the next signal finds them in the pool.
+        """
+        results = await asyncio.gather(*(self._ping() for _ in range(self.warm_connections)))
+        return all(results)
+
+    async def keepalive(self):
+        """
+        Re-warm the pool whenever it has been idle for `ping_interval` seconds,
+        before the server or the connector drops the idle connections.
+        """
+        while True:
+            await asyncio.sleep(self.ping_interval)
+            idle = time.monotonic() - self.last_activity if self.last_activity else None
+            if idle is None or idle >= self.ping_interval:
+                await self.prewarm()
+
+    def report(self):
+        total = self.connections_created + self.connections_reused
+        stats = {
+            "requests": self.requests,
+            "connections_created": self.connections_created,
+            "connections_reused": self.connections_reused,
+            "reuse_ratio": self.connections_reused / total if total else None,
+            "dns_cache_hits": self.dns_cache_hits,
+            "dns_cache_misses": self.dns_cache_misses,
+        }
+        if self.handshake_ms:
+            arr = np.array(self.handshake_ms)
+            stats["handshake_ms_p50"] = float(np.percentile(arr, 50))
+            stats["handshake_ms_max"] = float(arr.max())
+        else:
+            stats["handshake_ms_p50"] = None
+            stats["handshake_ms_max"] = None
+        return stats
+
+    async def close(self):
+        if self._keepalive_task is not None:
+            self._keepalive_task.cancel()
+            self._keepalive_task = None
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
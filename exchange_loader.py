@@ -0,0 +1,71 @@
+import importlib
+import importlib.util
+import os
+import sys
+import types
+
+# Modules the real ccxt/__init__.py re-exports names from; the hollow package resolves against these
+_CCXT_EXPORTS = (
+    "ccxt.base.errors",
+    "ccxt.base.exchange",
+    "ccxt.base.precise",
+    "ccxt.base.decimal_to_precision",
+    "ccxt.base.order_router",
+)
+
+def _ccxt_getattr(name):
+    # Module-level __getattr__ only runs on a miss, so caching the result makes each name a one-time lookup
+    if name.startswith("__") and name != "__version__":
+        # module metadata (__file__, __all__, ...) must not leak in from the base modules
+        raise AttributeError(f"module 'ccxt' has no attribute '{name}'")
+    for module_name in _CCXT_EXPORTS:
+        module = importlib.import_module(module_name)
+        if name in module.__dict__:
+            value = module.__dict__[name]
+            setattr(sys.modules["ccxt"], name, value)
+            return value
+    raise AttributeError(
+        f"module 'ccxt' has no attribute '{name}' (ccxt was loaded by exchange_loader.load_binance, "
+        "which only provides the base classes and errors; import exchange modules directly)"
+    )
+
+def _hollow_package(name, path):
+    module = types.ModuleType(name)
+    module.__path__ = [path]
+    module.__spec__ = importlib.util.spec_from_loader(name, loader=None, is_package=True)
+    module.__spec__.submodule_search_locations = [path]
+    return module
+
+def load_binance():
+    """
+    Import only ccxt's async binance class.
+    `from ccxt.async_support import binance` runs ccxt/__init__.py and ccxt/async_support/__init__.py,
+    which import every exchange (300+ modules). Registering empty parent packages first lets the
+    binance module and its base classes load on their own. Falls back to the regular import if
+    ccxt is already loaded or its layout differs.
+    Afterwards the top-level `ccxt` namespace only resolves names from ccxt.base (Exchange, Precise,
+    errors, decimal_to_precision); `ccxt.exchanges` or `ccxt.<exchange>` raise AttributeError, so other
+    code must import e.g. `ccxt.async_support.bybit` by full module path.
+    """
+    loaded = sys.modules.get("ccxt.async_support.binance")
+    if loaded is not None:
+        return loaded.binance
+    if "ccxt" in sys.modules:
+        from ccxt.async_support import binance
+        return binance
+    spec = importlib.util.find_spec("ccxt")
+    root = spec.submodule_search_locations[0]
+    ccxt_pkg = _hollow_package("ccxt", root)
+    ccxt_pkg.__getattr__ = _ccxt_getattr
+    sys.modules["ccxt"] = ccxt_pkg
+    sys.modules["ccxt.async_support"] = _hollow_package("ccxt.async_support", os.path.join(root, "async_support"))
+    try:
+        from ccxt.async_support.binance import binance
+        # importing the submodule bound the *module* on the package; the real __init__ binds the class,
+        # which `from ccxt.async_support import binance` callers expect
+        sys.modules["ccxt.async_support"].binance = binance
+    except Exception:
+        for name in [n for n in sys.modules if n == "ccxt" or n.startswith("ccxt.")]:
+            del sys.modules[name]
+        from ccxt.async_support import binance
+    return binance
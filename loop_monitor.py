@@ -0,0 +1,83 @@
+import asyncio
+import sys
+import threading
+import time
+import traceback
+import numpy as np
+from collections import deque
+from datetime import datetime, UTC
+
+class LoopLagMonitor:
+    def __init__(self, interval=0.1, stall_threshold_ms=100, maxlen=1000, max_samples=50):
+        self.interval = interval
+        self.stall_threshold_ms = stall_threshold_ms
+        self.lags_ms = deque(maxlen=maxlen)  # scheduling lag of each heartbeat, in ms
+        self.stall_samples = deque(maxlen=max_samples)  # stack samples of whatever blocked the loop
+        self.stall_count = 0  # all stalls seen, including samples already drained
+        self._last_beat = None
+        self._loop_thread_id = None
+        self._running = False
+        self._watchdog_thread = None
+
+    async def run(self):
+        """
+        Heartbeat on the event loop every `interval` seconds and record how late each wake-up is.
+        A watchdog thread samples the loop thread's stack whenever a heartbeat is overdue.
+        """
+        self._loop_thread_id = threading.get_ident()
+        self._running = True
+        self._watchdog_thread = threading.Thread(target=self._watchdog, name="loop-watchdog", daemon=True)
+        self._watchdog_thread.start()
+        try:
+            while self._running:
+                self._last_beat = time.perf_counter()
+                await asyncio.sleep(self.interval)
+                lag_ms = (time.perf_counter() - self._last_beat - self.interval) * 1000
+                self.lags_ms.append(max(lag_ms, 0.0))
+        finally:
+            self._running = False
+
+    def _watchdog(self):
+        poll = min(self.interval, self.stall_threshold_ms / 1000) / 2
+        sampled_beat = None
+        while self._running:
+            time.sleep(poll)
+            beat = self._last_beat
+            if beat is None or beat == sampled_beat:
+                continue
+            blocked_ms = (time.perf_counter() - beat - self.interval) * 1000
+            if blocked_ms < self.stall_threshold_ms:
+                continue
+            frame = sys._current_frames().get(self._loop_thread_id)
+            if frame is None:
+                continue
+            self.stall_samples.append({
+                "timestamp": datetime.now(UTC).isoformat(),
+                "blocked_ms": blocked_ms,
+                "stack": "".join(traceback.format_stack(frame)),
+            })
+            self.stall_count += 1
+            sampled_beat = beat  # one sample per stall
+
+    def drain_stalls(self):
+        """Pop and return the stall samples recorded since the last drain."""
+        samples = []
+        while self.stall_samples:
+            samples.append(self.stall_samples.popleft())
+        return samples
+
+    def stop(self):
+        self._running = False
+
+    def percentiles(self, qs=(50, 90, 99)):
+        if not self.lags_ms:
+            return {f"p{q}": None for q in qs}
+        arr = np.array(self.lags_ms)
+        return {f"p{q}": float(np.percentile(arr, q)) for q in qs}
+
+    def report(self):
+        stats = self.percentiles()
+        stats["max"] = max(self.lags_ms) if self.lags_ms else None
+        stats["samples"] = len(self.lags_ms)
+        stats["stalls"] = self.stall_count
+        return stats
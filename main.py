@@ -1,20 +1,32 @@
+import time
+
+_T0 = time.perf_counter()  # startup profile reference point
+
 import asyncio
+import json
 import os
 import sqlite3
+import sys
 from datetime import datetime, UTC
 
-from ccxt.async_support import binance
+from exchange_loader import load_binance
 from trade_identification import TradeIdentificationEngine
 from strategy_core import MathematicalStrategyCore
 from risk_execution import RiskExecutionLayer
+from loop_monitor import LoopLagMonitor
+from connection_pool import ExchangeConnectionManager
+from protective_exits import ProtectiveExitManager
+from account_state import AccountStateCache
 from dotenv import load_dotenv
 
 load_dotenv()  # load environment variables
 
+SCHEMA_VERSION = 1  # PRAGMA user_version of trading_bot.db, see ScalpingBot.migrate_schema
+
 
 class ScalpingBot:
     def __init__(self, api_key, api_secret):
-        self.exchange = binance(
+        self.exchange = load_binance()(
             {
                 "apiKey": api_key,
                 "secret": api_secret,
@@ -27,10 +39,30 @@ class ScalpingBot:
         self.trade_id_engine = TradeIdentificationEngine(self.exchange, symbol=self.symbol)
         self.strategy_core = MathematicalStrategyCore()
         self.risk_exec = RiskExecutionLayer(self.exchange, symbol=self.symbol)
+        self.conn_manager = ExchangeConnectionManager(
+            self.exchange.urls["api"]["fapiPublic"] + "/ping",
+            pool_size=int(os.getenv("HTTP_POOL_SIZE", "10")),
+            ping_interval=float(os.getenv("HTTP_PING_INTERVAL", "20")),
+        )
+        self.loop_monitor = LoopLagMonitor(stall_threshold_ms=float(os.getenv("LOOP_STALL_MS", "100")))
+        self.loop_monitor_task = None
+        self.health_interval = float(os.getenv("LOOP_REPORT_SECONDS", "60"))
+        self.health_task = None
         self.journal = open("trade_journal.log", "a")
         self.db_conn = sqlite3.connect("trading_bot.db")
         self.create_tables()
+        self.migrate_schema()
         self.current_trade = None  # {"status": "open"/"stopped"/None, ...}
+        # "poll": market exit from monitor_open_trade; "exchange": reduce-only stop/take-profit orders
+        self.exit_mode = os.getenv("EXIT_MODE", "poll")
+        self.protective_exits = ProtectiveExitManager(self.exchange, self.strategy_core, symbol=self.symbol)
+        self.protective_refresh = float(os.getenv("PROTECTIVE_REFRESH_SECONDS", "60"))
+        self.protective_fill_check = float(os.getenv("PROTECTIVE_FILL_CHECK_SECONDS", "1"))
+        self.account = AccountStateCache(
+            self.exchange,
+            refresh_interval=float(os.getenv("BALANCE_REFRESH_SECONDS", "5")),
+            max_age=float(os.getenv("BALANCE_MAX_AGE_SECONDS", "30")),
+        )
 
     def create_tables(self):
         cur = self.db_conn.cursor()
@@ -58,40 +90,207 @@ class ScalpingBot:
         )
         self.db_conn.commit()
 
+    def migrate_schema(self):
+        """
+        Schema v1: numeric epoch `ts` columns next to the ISO `timestamp` text, range indexes,
+        and daily_pnl / symbol_stats summary tables kept current by an insert trigger on orders.
+        Existing rows are backfilled and the summaries rebuilt from history in one transaction.
+        """
+        cur = self.db_conn.cursor()
+        if cur.execute("PRAGMA user_version").fetchone()[0] >= SCHEMA_VERSION:
+            return
+        with self.db_conn:
+            cur.execute("BEGIN")  # DDL included, so an interrupted migration rolls back completely
+            for table in ("orders", "logs"):
+                columns = [row[1] for row in cur.execute(f"PRAGMA table_info({table})")]
+                if "ts" not in columns:
+                    cur.execute(f"ALTER TABLE {table} ADD COLUMN ts REAL")
+                cur.execute(
+                    f"UPDATE {table} SET ts = (julianday(timestamp) - 2440587.5) * 86400 WHERE ts IS NULL"
+                )
+            # pnl rides along in the index so range sums never touch the table
+            cur.execute("CREATE INDEX IF NOT EXISTS idx_orders_symbol_ts ON orders (symbol, ts, pnl)")
+            cur.execute("CREATE INDEX IF NOT EXISTS idx_orders_ts ON orders (ts)")
+            cur.execute("CREATE INDEX IF NOT EXISTS idx_logs_ts ON logs (ts)")
+            cur.execute(
+                """
+                CREATE TABLE IF NOT EXISTS daily_pnl (
+                    day TEXT,
+                    symbol TEXT,
+                    trades INTEGER,
+                    wins INTEGER,
+                    pnl REAL,
+                    PRIMARY KEY (day, symbol)
+                )
+            """
+            )
+            cur.execute(
+                """
+                CREATE TABLE IF NOT EXISTS symbol_stats (
+                    symbol TEXT PRIMARY KEY,
+                    trades INTEGER,
+                    wins INTEGER,
+                    cum_pnl REAL,
+                    peak_pnl REAL,
+                    max_drawdown REAL
+                )
+            """
+            )
+            cur.execute(
+                """
+                CREATE TRIGGER IF NOT EXISTS orders_summary AFTER INSERT ON orders
+                WHEN NEW.pnl IS NOT NULL
+                BEGIN
+                    INSERT INTO daily_pnl (day, symbol, trades, wins, pnl)
+                    VALUES (date(NEW.ts, 'unixepoch'), NEW.symbol, 1, NEW.pnl > 0, NEW.pnl)
+                    ON CONFLICT (day, symbol) DO UPDATE SET
+                        trades = trades + 1, wins = wins + excluded.wins, pnl = pnl + excluded.pnl;
+                    INSERT INTO symbol_stats (symbol, trades, wins, cum_pnl, peak_pnl, max_drawdown)
+                    VALUES (NEW.symbol, 0, 0, 0, 0, 0)
+                    ON CONFLICT (symbol) DO NOTHING;
+                    UPDATE symbol_stats SET
+                        trades = trades + 1,
+                        wins = wins + (NEW.pnl > 0),
+                        cum_pnl = cum_pnl + NEW.pnl,
+                        peak_pnl = MAX(peak_pnl, cum_pnl + NEW.pnl),
+                        max_drawdown = MAX(max_drawdown, MAX(peak_pnl, cum_pnl + NEW.pnl) - (cum_pnl + NEW.pnl))
+                    WHERE symbol = NEW.symbol;
+                END
+            """
+            )
+            cur.execute("DELETE FROM daily_pnl")
+            cur.execute("DELETE FROM symbol_stats")
+            cur.execute(
+                """
+                INSERT INTO daily_pnl (day, symbol, trades, wins, pnl)
+                SELECT date(ts, 'unixepoch'), symbol, COUNT(*), SUM(pnl > 0), SUM(pnl)
+                FROM orders WHERE pnl IS NOT NULL
+                GROUP BY date(ts, 'unixepoch'), symbol
+            """
+            )
+            cur.execute(
+                """
+                INSERT INTO symbol_stats (symbol, trades, wins, cum_pnl, peak_pnl, max_drawdown)
+                SELECT symbol, COUNT(*), SUM(pnl > 0), SUM(pnl), MAX(peak), MAX(peak - cum)
+                FROM (
+                    SELECT symbol, pnl, cum, MAX(0, MAX(cum) OVER (PARTITION BY symbol ORDER BY ts, id)) AS peak
+                    FROM (
+                        SELECT id, symbol, ts, pnl, SUM(pnl) OVER (PARTITION BY symbol ORDER BY ts, id) AS cum
+                        FROM orders WHERE pnl IS NOT NULL
+                    )
+                )
+                GROUP BY symbol
+            """
+            )
+            cur.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
     def log_order_history(self, symbol, side, entry_price, exit_price, pnl):
+        now = datetime.now(UTC)
         cur = self.db_conn.cursor()
         cur.execute(
             """
-            INSERT INTO orders (timestamp, symbol, side, entry_price, exit_price, pnl)
-            VALUES (?,?,?,?,?,?)
+            INSERT INTO orders (timestamp, ts, symbol, side, entry_price, exit_price, pnl)
+            VALUES (?,?,?,?,?,?,?)
         """,
-            (datetime.now(UTC).isoformat(), symbol, side, entry_price, exit_price, pnl),
+            (now.isoformat(), now.timestamp(), symbol, side, entry_price, exit_price, pnl),
         )
         self.db_conn.commit()
 
     def log_to_db(self, message):
+        now = datetime.now(UTC)
         cur = self.db_conn.cursor()
         cur.execute(
             """
-            INSERT INTO logs (timestamp, message)
-            VALUES (?,?)
+            INSERT INTO logs (timestamp, ts, message)
+            VALUES (?,?,?)
         """,
-            (datetime.now(UTC).isoformat(), message),
+            (now.isoformat(), now.timestamp(), message),
         )
         self.db_conn.commit()
 
+    def daily_pnl(self, symbol=None, since=None):
+        """
+        Per-day (day, symbol, trades, wins, pnl) rows from the summary table; `since` is a YYYY-MM-DD day.
+        """
+        query = "SELECT day, symbol, trades, wins, pnl FROM daily_pnl WHERE day >= ?"
+        args = [since or ""]
+        if symbol is not None:
+            query += " AND symbol = ?"
+            args.append(symbol)
+        return self.db_conn.execute(query + " ORDER BY day, symbol", args).fetchall()
+
+    def performance_summary(self, symbol=None):
+        symbol = symbol or self.symbol
+        row = self.db_conn.execute(
+            "SELECT trades, wins, cum_pnl, max_drawdown FROM symbol_stats WHERE symbol = ?", (symbol,)
+        ).fetchone()
+        if row is None:
+            return {"symbol": symbol, "trades": 0, "win_rate": None, "cum_pnl": 0.0, "max_drawdown": 0.0}
+        trades, wins, cum_pnl, max_drawdown = row
+        return {
+            "symbol": symbol,
+            "trades": trades,
+            "win_rate": wins / trades if trades else None,
+            "cum_pnl": cum_pnl,
+            "max_drawdown": max_drawdown,
+        }
+
+    def pnl_between(self, start_ts, end_ts, symbol=None):
+        """
+        (trades, summed pnl) for orders with start_ts <= ts < end_ts, served from the covering index.
+        """
+        return self.db_conn.execute(
+            "SELECT COUNT(pnl), COALESCE(SUM(pnl), 0) FROM orders WHERE symbol = ? AND ts >= ? AND ts < ?",
+            (symbol or self.symbol, start_ts, end_ts),
+        ).fetchone()
+
+    def orders_between(self, start_ts, end_ts, symbol=None, limit=1000):
+        return self.db_conn.execute(
+            """
+            SELECT id, timestamp, symbol, side, entry_price, exit_price, pnl FROM orders
+            WHERE symbol = ? AND ts >= ? AND ts < ? ORDER BY ts LIMIT ?
+        """,
+            (symbol or self.symbol, start_ts, end_ts, limit),
+        ).fetchall()
+
+    def logs_between(self, start_ts, end_ts, limit=1000):
+        return self.db_conn.execute(
+            "SELECT timestamp, message FROM logs WHERE ts >= ? AND ts < ? ORDER BY ts LIMIT ?",
+            (start_ts, end_ts, limit),
+        ).fetchall()
+
     async def on_new_1m_bar(self, bar):
         close = bar[4]
         self.strategy_core.update_1m_close(close)
 
+    async def fetch_atr(self):
+        bars_1m = await self.exchange.fetch_ohlcv(self.symbol, "1m", limit=50)
+        highs = [b[2] for b in bars_1m]
+        lows = [b[3] for b in bars_1m]
+        closes = [b[4] for b in bars_1m]
+        return self.strategy_core.compute_atr(highs, lows, closes, window=14)
+
+    def record_exit(self, tag, side, exit_price):
+        pnl = (
+            (exit_price - self.current_trade["price"]) / self.current_trade["price"]
+            if self.current_trade["signal"] == "long"
+            else (self.current_trade["price"] - exit_price) / self.current_trade["price"]
+        )
+        self.strategy_core.update_trade_return(pnl * 100)
+        notional = self.current_trade["price"] * self.current_trade["quantity"]
+        self.account.apply_fill(realized_pnl=pnl * notional, margin_delta=notional)
+        log_msg = f"{datetime.now(UTC)} {tag} {side} price={exit_price} pnl={pnl}"
+        self.journal.write(log_msg + "\n")
+        self.log_to_db(log_msg)
+        self.log_order_history(
+            self.symbol, self.current_trade["signal"], self.current_trade["price"], exit_price, pnl
+        )
+        self.current_trade = None
+
     async def monitor_open_trade(self):
         # Poll ATR & mark price every 5s to check for ATR-based exit
         while self.current_trade and self.current_trade["status"] == "open":
-            bars_1m = await self.exchange.fetch_ohlcv(self.symbol, "1m", limit=50)
-            highs = [b[2] for b in bars_1m]
-            lows = [b[3] for b in bars_1m]
-            closes = [b[4] for b in bars_1m]
-            atr = self.strategy_core.compute_atr(highs, lows, closes, window=14)
+            atr = await self.fetch_atr()
             ticker = await self.exchange.fetch_ticker(self.symbol)
             mark_price = float(ticker["last"])
 
@@ -103,23 +302,43 @@ class ScalpingBot:
                 await self.exchange.create_order(
                     self.symbol, "MARKET", side, self.current_trade["quantity"]
                 )
-                pnl = (
-                    (mark_price - self.current_trade["price"]) / self.current_trade["price"]
-                    if self.current_trade["signal"] == "long"
-                    else (self.current_trade["price"] - mark_price) / self.current_trade["price"]
-                )
-                self.strategy_core.update_trade_return(pnl * 100)
-                log_msg = f"{datetime.now(UTC)} EXIT_AT_MARKET {side} price={mark_price} pnl={pnl}"
-                self.journal.write(log_msg + "\n")
-                self.log_to_db(log_msg)
-                self.log_order_history(
-                    self.symbol, self.current_trade["signal"], self.current_trade["price"], mark_price, pnl
-                )
-                self.current_trade = None
+                self.record_exit("EXIT_AT_MARKET", side, mark_price)
                 break
 
             await asyncio.sleep(5)
 
+    async def manage_protective_exits(self):
+        # Exits fill on the exchange; this books fills every PROTECTIVE_FILL_CHECK_SECONDS
+        # and re-sizes the triggers only once per PROTECTIVE_REFRESH_SECONDS (one 1m bar)
+        last_amend = time.monotonic()
+        while self.current_trade and self.current_trade["status"] == "open":
+            try:
+                fill = await self.protective_exits.check_fills()
+                if fill:
+                    side = "BUY" if self.current_trade["signal"] == "short" else "SELL"
+                    self.record_exit(f"EXIT_{fill['kind'].upper()}", side, fill["price"])
+                    break
+                if time.monotonic() - last_amend >= self.protective_refresh:
+                    last_amend = time.monotonic()
+                    await self.protective_exits.amend(await self.fetch_atr())
+            except Exception as e:
+                print(f"Error managing protective exits: {e}")
+            await asyncio.sleep(self.protective_fill_check)
+
+    async def restore_protective_exits(self):
+        position = await self.protective_exits.reconcile(await self.fetch_atr())
+        if position:
+            self.current_trade = {
+                "price": position["price"],
+                "quantity": position["quantity"],
+                "signal": position["signal"],
+                "status": "open",
+            }
+            msg = f"{datetime.now(UTC)} RESTORED_{position['signal'].upper()} price={position['price']} qty={position['quantity']}"
+            self.journal.write(msg + "\n")
+            self.log_to_db(msg)
+            asyncio.create_task(self.manage_protective_exits())
+
     async def set_leverage_safe(self, leverage=1):
         try:
             await self.exchange.set_leverage(leverage, self.symbol)
@@ -131,8 +350,47 @@ class ScalpingBot:
             self.journal.write(msg + "\n")
             self.log_to_db(msg)
 
+    def log_loop_health(self):
+        stats = self.loop_monitor.report()
+        msg = (
+            f"{datetime.now(UTC)} LOOP_LAG p50={stats['p50']} p90={stats['p90']} p99={stats['p99']} "
+            f"max={stats['max']} stalls={stats['stalls']}"
+        )
+        self.journal.write(msg + "\n")
+        self.log_to_db(msg)
+        for sample in self.loop_monitor.drain_stalls():
+            self.journal.write(f"{sample['timestamp']} LOOP_STALL blocked_ms={sample['blocked_ms']:.1f}\n{sample['stack']}")
+        self.journal.flush()
+
+    def log_connection_health(self):
+        conn = self.conn_manager.report()
+        msg = (
+            f"{datetime.now(UTC)} HTTP_POOL requests={conn['requests']} created={conn['connections_created']} "
+            f"reused={conn['connections_reused']} reuse_ratio={conn['reuse_ratio']} "
+            f"handshake_ms_p50={conn['handshake_ms_p50']} handshake_ms_max={conn['handshake_ms_max']}"
+        )
+        self.journal.write(msg + "\n")
+        self.log_to_db(msg)
+
+    async def report_health(self):
+        # Export lag percentiles, new stall stacks and connection reuse while running, not just at shutdown
+        while True:
+            await asyncio.sleep(self.health_interval)
+            try:
+                self.log_loop_health()
+                self.log_connection_health()
+            except Exception as e:
+                print(f"Error reporting health: {e}")
+
     async def main_loop(self):
+        self.loop_monitor_task = asyncio.create_task(self.loop_monitor.run())
+        self.health_task = asyncio.create_task(self.report_health())
+        await self.conn_manager.start(self.exchange)
         await self.set_leverage_safe(1)
+        await self.account.refresh()
+        self.account.start()
+        if self.exit_mode == "exchange":
+            await self.restore_protective_exits()
         await self.trade_id_engine.fetch_historical()
         bar_list = await self.exchange.fetch_ohlcv(self.symbol, "1m", limit=50)
         for bar in bar_list:
@@ -146,11 +404,15 @@ class ScalpingBot:
                 entry_price = result["price"]
 
                 # Strict money management and liquidation safety check before trade
-                try:
-                    balance = await self.exchange.fetch_balance()
-                    usdt_balance = balance.get("total", {}).get("USDT", 10000)
-                except Exception:
-                    usdt_balance = 10000
+                usdt_balance = self.account.balance()
+                if usdt_balance is None:
+                    staleness = self.account.staleness()
+                    msg = f"{datetime.now(UTC)} BLOCKED_STALE_BALANCE staleness={staleness} max_age={self.account.max_age} error={self.account.last_error}"
+                    self.journal.write(msg + "\n")
+                    self.log_to_db(msg)
+                    identification_task = asyncio.create_task(self.trade_id_engine.run())
+                    await asyncio.sleep(0.01)
+                    continue
 
                 kelly_fraction = self.risk_exec.estimate_kelly_fraction()
                 max_risk_usd = getattr(self.risk_exec, "max_risk", 100)
@@ -172,8 +434,18 @@ class ScalpingBot:
                     identification_task = asyncio.create_task(self.trade_id_engine.run())
                     continue
 
+                if self.protective_exits.position:
+                    # a second entry would orphan the reduce-only orders guarding the open position
+                    msg = f"{datetime.now(UTC)} BLOCKED_POSITION_OPEN"
+                    self.journal.write(msg + "\n")
+                    self.log_to_db(msg)
+                    identification_task = asyncio.create_task(self.trade_id_engine.run())
+                    await asyncio.sleep(0.01)
+                    continue
+
                 trade_resp = await self.risk_exec.execute_trade(result, entry_price)
                 if trade_resp and trade_resp["status"] == "open":
+                    self.account.apply_fill(margin_delta=-entry_price * trade_resp["quantity"])
                     self.current_trade = {
                         "price": entry_price,
                         "quantity": trade_resp["quantity"],
@@ -183,7 +455,23 @@ class ScalpingBot:
                     msg = f"{datetime.now(UTC)} PLAN_{result['signal'].upper()} price={entry_price} qty={trade_resp['quantity']}"
                     self.journal.write(msg + "\n")
                     self.log_to_db(msg)
-                    asyncio.create_task(self.monitor_open_trade())
+                    protected = False
+                    if self.exit_mode == "exchange":
+                        try:
+                            atr = await self.fetch_atr()
+                            if atr:
+                                await self.protective_exits.open(
+                                    result["signal"], entry_price, trade_resp["quantity"], atr
+                                )
+                                protected = True
+                        except Exception as e:
+                            msg = f"{datetime.now(UTC)} WARNING: protective orders failed, polling exits instead: {e}"
+                            self.journal.write(msg + "\n")
+                            self.log_to_db(msg)
+                    if protected:
+                        asyncio.create_task(self.manage_protective_exits())
+                    else:
+                        asyncio.create_task(self.monitor_open_trade())
                 else:
                     if trade_resp:
                         msg = f"{datetime.now(UTC)} MICRO_STOP price={trade_resp['price']} pnl={trade_resp['pnl']}"
@@ -194,12 +482,44 @@ class ScalpingBot:
             await asyncio.sleep(0.01)
 
     async def close(self):
+        self.loop_monitor.stop()
+        if self.health_task is not None:
+            self.health_task.cancel()
+        self.account.stop()
+        if self.loop_monitor.lags_ms:
+            self.log_loop_health()
+        if self.conn_manager.requests:
+            self.log_connection_health()
         await self.exchange.close()
+        await self.conn_manager.close()
         self.journal.close()
         self.db_conn.close()
 
 
+def profile_startup():
+    """
+    Time each cold-start phase up to the point where the bot is ready to poll.
+    Run with `python -X importtime main.py --profile-startup` for a per-module breakdown.
+    """
+    imports_done = time.perf_counter()
+    load_binance()
+    exchange_loaded = time.perf_counter()
+    bot = ScalpingBot(os.getenv("BINANCE_API_KEY", ""), os.getenv("BINANCE_SECRET_KEY", ""))
+    bot_ready = time.perf_counter()
+    asyncio.run(bot.close())
+    return {
+        "imports_ms": (imports_done - _T0) * 1000,
+        "exchange_class_ms": (exchange_loaded - imports_done) * 1000,
+        "bot_init_ms": (bot_ready - exchange_loaded) * 1000,
+        "total_ms": (bot_ready - _T0) * 1000,
+        "ccxt_modules": len([name for name in sys.modules if name == "ccxt" or name.startswith("ccxt.")]),
+    }
+
+
 if __name__ == "__main__":
+    if "--profile-startup" in sys.argv:
+        print(json.dumps(profile_startup(), indent=2))
+        exit(0)
     # Load config from .env file
     load_dotenv()  # Load environment variables
     API_KEY = os.getenv("BINANCE_API_KEY")
@@ -0,0 +1,161 @@
+import asyncio
+import time
+
+CLIENT_ID_PREFIX = "mbaexit"
+
+ORDER_TYPES = {"stop": "STOP_MARKET", "take_profit": "TAKE_PROFIT_MARKET"}
+
+# ccxt sends conditional futures orders to Binance's algo-order endpoint; fetch/cancel/list only
+# reach that endpoint when this flag is passed, otherwise they query regular orders and miss ours
+TRIGGER = {"trigger": True}
+
+class ProtectiveExitManager:
+    def __init__(self, exchange, strategy_core, symbol="ETH/USDT", amend_threshold=0.1):
+        self.exchange = exchange
+        self.strategy_core = strategy_core
+        self.symbol = symbol
+        self.amend_threshold = amend_threshold  # re-place only if a trigger moves by this fraction of ATR
+        self.position = None  # {"signal", "price", "quantity", "stop_price", "take_profit_price"}
+        self.orders = {}  # {"stop": order, "take_profit": order}
+
+    async def _place(self, kind, trigger_price):
+        side = "BUY" if self.position["signal"] == "short" else "SELL"
+        params = {
+            "stopPrice": trigger_price,
+            "reduceOnly": True,
+            "workingType": "MARK_PRICE",
+            "clientOrderId": f"{CLIENT_ID_PREFIX}-{kind}-{int(time.time() * 1000)}",
+        }
+        order = await self.exchange.create_order(
+            self.symbol, ORDER_TYPES[kind], side, self.position["quantity"], None, params
+        )
+        self.position[f"{kind}_price"] = trigger_price
+        self.orders[kind] = order
+        return order
+
+    async def open(self, signal, entry_price, quantity, atr):
+        """
+        Place reduce-only stop and take-profit orders for a freshly filled entry.
+        If either is rejected, the one that went through is cancelled and the error re-raised,
+        so the caller can fall back to polling exits without a stray trigger left on the book.
+        """
+        stop_price, take_profit_price = self.strategy_core.protective_levels(entry_price, atr, signal)
+        self.position = {"signal": signal, "price": entry_price, "quantity": quantity}
+        self.orders = {}
+        results = await asyncio.gather(
+            self._place("stop", stop_price), self._place("take_profit", take_profit_price), return_exceptions=True
+        )
+        errors = [r for r in results if isinstance(r, Exception)]
+        if errors:
+            await self._cancel_all()
+            self.position = None
+            raise errors[0]
+        return self.position
+
+    async def _cancel_all(self):
+        for kind, order in self.orders.items():
+            try:
+                await self.exchange.cancel_order(order["id"], self.symbol, TRIGGER)
+            except Exception as e:
+                print(f"Error cancelling {kind} order: {e}")
+        self.orders = {}
+
+    async def amend(self, atr):
+        """
+        Move the triggers to the current ATR levels. Binance cannot modify conditional orders,
+        so the replacement is placed before the old order is cancelled to keep the position covered.
+        """
+        if not self.position or not atr:
+            return False
+        levels = self.strategy_core.protective_levels(self.position["price"], atr, self.position["signal"])
+        amended = False
+        for kind, trigger_price in zip(("stop", "take_profit"), levels):
+            if kind not in self.orders:
+                # never placed (e.g. reconciled without ATR) or lost after a rejected replacement
+                await self._place(kind, trigger_price)
+                amended = True
+                continue
+            if abs(trigger_price - self.position[f"{kind}_price"]) < self.amend_threshold * atr:
+                continue
+            old = self.orders.get(kind)
+            await self._place(kind, trigger_price)
+            if old:
+                try:
+                    await self.exchange.cancel_order(old["id"], self.symbol, TRIGGER)
+                except Exception as e:
+                    print(f"Error cancelling replaced {kind} order: {e}")
+            amended = True
+        return amended
+
+    async def check_fills(self):
+        """
+        Return {"kind", "price"} once the position has been closed, after cancelling what is left of ours.
+        Every tracked order's status is read before anything is re-placed, because a filled take-profit
+        makes Binance expire the reduce-only stop (and vice versa). Orders that vanished without filling
+        are re-placed only while the position is still open; a flat position with no fill of ours is
+        booked as an "external" close at the last price.
+        """
+        if not self.position:
+            return None
+        open_ids = {o["id"] for o in await self.exchange.fetch_open_orders(self.symbol, None, None, TRIGGER)}
+        missing = []
+        for kind, order in self.orders.items():
+            if order["id"] in open_ids:
+                continue
+            status = await self.exchange.fetch_order(order["id"], self.symbol, TRIGGER)
+            if status["status"] == "closed":
+                fill = {"kind": kind, "price": float(status.get("average") or self.position[f"{kind}_price"])}
+                del self.orders[kind]
+                await self._cancel_all()
+                self.position = None
+                return fill
+            missing.append(kind)
+        if not missing:
+            return None
+
+        positions = await self.exchange.fetch_positions([self.symbol])
+        if not any(p.get("contracts") for p in positions):
+            ticker = await self.exchange.fetch_ticker(self.symbol)
+            for kind in missing:
+                del self.orders[kind]
+            await self._cancel_all()
+            self.position = None
+            return {"kind": "external", "price": float(ticker["last"])}
+        for kind in missing:
+            await self._place(kind, self.position[f"{kind}_price"])
+        return None
+
+    async def reconcile(self, atr):
+        """
+        Rebuild state after a restart: adopt our open protective orders for the live position,
+        place any that are missing, and cancel orphans when no position is open.
+        """
+        positions = await self.exchange.fetch_positions([self.symbol])
+        open_orders = await self.exchange.fetch_open_orders(self.symbol, None, None, TRIGGER)
+        ours = [o for o in open_orders if (o.get("clientOrderId") or "").startswith(CLIENT_ID_PREFIX)]
+        live = next((p for p in positions if p.get("contracts")), None)
+        self.position = None
+        self.orders = {}
+        if live is None:
+            for order in ours:
+                await self.exchange.cancel_order(order["id"], self.symbol, TRIGGER)
+            return None
+
+        self.position = {
+            "signal": "short" if live["side"] == "short" else "long",
+            "price": float(live["entryPrice"]),
+            "quantity": float(live["contracts"]),
+        }
+        for order in ours:
+            kind = order["clientOrderId"].split("-")[1]
+            if kind in ORDER_TYPES and kind not in self.orders:
+                self.orders[kind] = order
+                self.position[f"{kind}_price"] = float(order.get("triggerPrice") or order.get("stopPrice"))
+            else:
+                await self.exchange.cancel_order(order["id"], self.symbol, TRIGGER)  # duplicate left by a crash mid-amend
+        if atr:
+            levels = self.strategy_core.protective_levels(self.position["price"], atr, self.position["signal"])
+            for kind, trigger_price in zip(("stop", "take_profit"), levels):
+                if kind not in self.orders:
+                    await self._place(kind, trigger_price)
+        return self.position
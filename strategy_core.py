@@ -51,6 +51,16 @@ class MathematicalStrategyCore:
             return "exit_now"
         return None
 
+    def protective_levels(self, entry_price, atr, side="short"):
+        """
+        Trigger prices for exchange-side exits, from the same ATR bands as adaptive_stop_loss:
+        stop 0.3 ATR against the position, take-profit at the 0.5 ATR target move.
+        Returns (stop_price, take_profit_price).
+        """
+        if side == "short":
+            return entry_price + 0.3 * atr, entry_price - 0.5 * atr
+        return entry_price - 0.3 * atr, entry_price + 0.5 * atr
+
     def update_trade_return(self, pnl):
         self.returns_history.append(pnl)
 
@@ -0,0 +1,56 @@
+import asyncio
+import pytest
+from account_state import AccountStateCache
+
+class DummyExchange:
+    def __init__(self):
+        self.total = 5000.0
+        self.fail = False
+        self.delay = 0
+
+    async def fetch_balance(self):
+        snapshot = {"total": {"USDT": self.total}, "free": {"USDT": self.total}}
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise Exception("network down")
+        return snapshot
+
+@pytest.mark.asyncio
+async def test_balance_and_staleness():
+    cache = AccountStateCache(DummyExchange(), max_age=0.05)
+    assert cache.balance() is None and cache.staleness() is None
+    assert await cache.refresh()
+    assert cache.balance() == 5000.0
+    await asyncio.sleep(0.1)
+    assert cache.balance() is None
+    assert cache.balance(max_age=1) == 5000.0
+    assert cache.staleness() >= 0.1
+
+@pytest.mark.asyncio
+async def test_failed_refresh_keeps_last_snapshot():
+    exchange = DummyExchange()
+    cache = AccountStateCache(exchange)
+    await cache.refresh()
+    exchange.fail = True
+    assert not await cache.refresh()
+    assert cache.balance() == 5000.0
+    assert cache.last_error is not None
+
+@pytest.mark.asyncio
+async def test_optimistic_fill_not_undone_by_older_snapshot():
+    exchange = DummyExchange()
+    cache = AccountStateCache(exchange)
+    await cache.refresh()
+    exchange.delay = 0.05
+    pending = asyncio.create_task(cache.refresh())
+    await asyncio.sleep(0.01)
+    cache.apply_fill(realized_pnl=25.0, margin_delta=100.0)
+    assert not await pending
+    assert cache.total == 5025.0 and cache.free == 5125.0
+
+@pytest.mark.asyncio
+async def test_missing_currency_is_a_failed_refresh():
+    cache = AccountStateCache(DummyExchange(), currency="BUSD")
+    assert not await cache.refresh()
+    assert cache.updated_at is None and cache.balance() is None
+    assert "BUSD" in str(cache.last_error)
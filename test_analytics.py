@@ -0,0 +1,64 @@
+import asyncio
+import sqlite3
+import pytest
+from datetime import datetime, UTC
+from main import ScalpingBot, SCHEMA_VERSION
+
+@pytest.fixture
+def fresh_bot(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    bot = ScalpingBot("dummy", "dummy")
+    yield bot
+    asyncio.run(bot.close())
+
+def test_summaries_maintained_on_insert(fresh_bot):
+    for pnl in (0.02, -0.01, 0.03, -0.04, 0.01):
+        fresh_bot.log_order_history("ETH/USDT", "short", 2650, 2640, pnl)
+    summary = fresh_bot.performance_summary("ETH/USDT")
+    assert summary["trades"] == 5
+    assert summary["win_rate"] == pytest.approx(0.6)
+    assert summary["cum_pnl"] == pytest.approx(0.01)
+    assert summary["max_drawdown"] == pytest.approx(0.04)  # peak 0.04, trough 0.00
+    today = datetime.now(UTC).date().isoformat()
+    assert fresh_bot.daily_pnl("ETH/USDT") == [(today, "ETH/USDT", 5, 3, pytest.approx(0.01))]
+
+def test_range_queries_use_indexes(fresh_bot):
+    fresh_bot.log_order_history("ETH/USDT", "short", 2650, 2640, 0.02)
+    fresh_bot.log_to_db("hello")
+    now = datetime.now(UTC).timestamp()
+    assert fresh_bot.pnl_between(now - 60, now + 60) == (1, pytest.approx(0.02))
+    assert len(fresh_bot.orders_between(now - 60, now + 60)) == 1
+    assert fresh_bot.logs_between(now - 60, now + 60)[-1][1] == "hello"
+    plan = " ".join(row[3] for row in fresh_bot.db_conn.execute(
+        "EXPLAIN QUERY PLAN SELECT COUNT(pnl), SUM(pnl) FROM orders WHERE symbol = ? AND ts >= ? AND ts < ?",
+        ("ETH/USDT", 0, now),
+    ))
+    assert "COVERING INDEX idx_orders_symbol_ts" in plan
+
+def test_migration_backfills_legacy_db(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    conn = sqlite3.connect("trading_bot.db")
+    conn.execute("CREATE TABLE orders (id INTEGER PRIMARY KEY AUTOINCREMENT, timestamp TEXT, symbol TEXT, "
+                 "side TEXT, entry_price REAL, exit_price REAL, pnl REAL)")
+    conn.execute("CREATE TABLE logs (id INTEGER PRIMARY KEY AUTOINCREMENT, timestamp TEXT, message TEXT)")
+    rows = [("2025-06-01T10:00:00+00:00", 0.03), ("2025-06-01T11:00:00+00:00", -0.05),
+            ("2025-06-02T09:00:00+00:00", 0.01)]
+    conn.executemany("INSERT INTO orders (timestamp, symbol, side, entry_price, exit_price, pnl) "
+                     "VALUES (?, 'ETH/USDT', 'short', 2650, 2640, ?)", rows)
+    conn.commit()
+    conn.close()
+
+    bot = ScalpingBot("dummy", "dummy")
+    try:
+        assert bot.db_conn.execute("PRAGMA user_version").fetchone()[0] == SCHEMA_VERSION
+        ts = bot.db_conn.execute("SELECT ts FROM orders ORDER BY id LIMIT 1").fetchone()[0]
+        assert ts == pytest.approx(datetime(2025, 6, 1, 10, tzinfo=UTC).timestamp(), abs=0.01)
+        assert [row[0] for row in bot.daily_pnl(since="2025-06-01")] == ["2025-06-01", "2025-06-02"]
+        summary = bot.performance_summary("ETH/USDT")
+        assert summary["trades"] == 3
+        assert summary["max_drawdown"] == pytest.approx(0.05)
+        # Later inserts continue from the rebuilt running totals
+        bot.log_order_history("ETH/USDT", "short", 2650, 2640, -0.02)
+        assert bot.performance_summary("ETH/USDT")["max_drawdown"] == pytest.approx(0.06)
+    finally:
+        asyncio.run(bot.close())
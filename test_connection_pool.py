@@ -0,0 +1,82 @@
+import shutil
+import ssl
+import subprocess
+import pytest
+from aiohttp import web
+from connection_pool import ExchangeConnectionManager
+from exchange_loader import load_binance
+
+@pytest.fixture
+def tls_context(tmp_path):
+    if shutil.which("openssl") is None:
+        pytest.skip("openssl not available")
+    cert, key = tmp_path / "cert.pem", tmp_path / "key.pem"
+    subprocess.run(
+        ["openssl", "req", "-x509", "-newkey", "rsa:2048", "-nodes", "-days", "1",
+         "-subj", "/CN=localhost", "-keyout", str(key), "-out", str(cert)],
+        check=True, capture_output=True,
+    )
+    server_ctx = ssl.create_default_context(ssl.Purpose.CLIENT_AUTH)
+    server_ctx.load_cert_chain(cert, key)
+    client_ctx = ssl.create_default_context(cafile=str(cert))
+    return server_ctx, client_ctx, str(cert)
+
+async def start_local_https(server_ctx):
+    async def ping(request):
+        return web.json_response({})
+
+    app = web.Application()
+    app.router.add_get("/fapi/v1/ping", ping)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, "localhost", 0, ssl_context=server_ctx)
+    await site.start()
+    return runner, site._server.sockets[0].getsockname()[1]
+
+@pytest.mark.asyncio
+async def test_prewarm_and_reuse_against_local_https(tls_context):
+    server_ctx, client_ctx, _ = tls_context
+    runner, port = await start_local_https(server_ctx)
+
+    manager = ExchangeConnectionManager(f"https://localhost:{port}/fapi/v1/ping", warm_connections=2,
+                                        ping_interval=60, ssl_context=client_ctx)
+    try:
+        await manager.start()
+        assert manager.connections_created == 2
+        assert manager.report()["handshake_ms_p50"] > 0
+        # Requests after the pre-warm ride the pooled connections without a new handshake
+        for _ in range(3):
+            async with manager.session.get(manager.warm_url) as resp:
+                assert resp.status == 200
+        stats = manager.report()
+        assert stats["connections_created"] == 2
+        assert stats["connections_reused"] == 3
+        assert stats["requests"] == 5
+    finally:
+        await manager.close()
+        await runner.cleanup()
+
+@pytest.mark.asyncio
+async def test_ccxt_client_reuses_prewarmed_connection(tls_context, monkeypatch):
+    for var in ("HTTPS_PROXY", "https_proxy", "HTTP_PROXY", "http_proxy", "ALL_PROXY", "all_proxy"):
+        monkeypatch.delenv(var, raising=False)
+    server_ctx, _, cafile = tls_context
+    runner, port = await start_local_https(server_ctx)
+    url = f"https://localhost:{port}/fapi/v1/ping"
+    # Trust roots come from the exchange's cafile, not from a context handed to the manager
+    exchange = load_binance()({"cafile": cafile, "aiohttp_trust_env": True})
+    manager = ExchangeConnectionManager(url, warm_connections=1, ping_interval=60)
+    try:
+        await manager.start(exchange)
+        assert exchange.session is manager.session
+        assert manager.session.trust_env
+        assert manager.connections_created == 1
+        assert await exchange.fetch(url) == {}
+        stats = manager.report()
+        assert stats["connections_created"] == 1
+        assert stats["connections_reused"] == 1
+    finally:
+        await exchange.close()
+        assert manager.session is not None and not manager.session.closed
+        await manager.close()
+        await runner.cleanup()
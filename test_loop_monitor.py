@@ -0,0 +1,45 @@
+import asyncio
+import time
+import pytest
+from loop_monitor import LoopLagMonitor
+
+def blocking_call():
+    time.sleep(0.3)
+
+@pytest.mark.asyncio
+async def test_stall_is_sampled():
+    monitor = LoopLagMonitor(interval=0.02, stall_threshold_ms=100)
+    task = asyncio.create_task(monitor.run())
+    await asyncio.sleep(0.1)
+    blocking_call()
+    await asyncio.sleep(0.1)
+    monitor.stop()
+    await task
+    assert len(monitor.stall_samples) == 1
+    assert "blocking_call" in monitor.stall_samples[0]["stack"]
+    assert monitor.report()["max"] >= 200
+
+@pytest.mark.asyncio
+async def test_lag_percentiles():
+    monitor = LoopLagMonitor(interval=0.01)
+    assert monitor.percentiles()["p99"] is None
+    task = asyncio.create_task(monitor.run())
+    await asyncio.sleep(0.1)
+    monitor.stop()
+    await task
+    stats = monitor.percentiles()
+    assert stats["p50"] is not None
+    assert stats["p50"] <= stats["p99"]
+
+@pytest.mark.asyncio
+async def test_drain_stalls_keeps_count():
+    monitor = LoopLagMonitor(interval=0.02, stall_threshold_ms=100)
+    task = asyncio.create_task(monitor.run())
+    await asyncio.sleep(0.1)
+    blocking_call()
+    await asyncio.sleep(0.1)
+    monitor.stop()
+    await task
+    assert len(monitor.drain_stalls()) == 1
+    assert monitor.drain_stalls() == []
+    assert monitor.report()["stalls"] == 1
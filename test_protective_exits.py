@@ -0,0 +1,185 @@
+import asyncio
+import pytest
+from strategy_core import MathematicalStrategyCore
+from protective_exits import ProtectiveExitManager
+from main import ScalpingBot
+
+# Dummy exchange keeping conditional orders in memory. Like Binance's algo-order endpoint,
+# they are only visible to fetch/cancel/list calls that pass {"trigger": True}.
+class DummyExchange:
+    def __init__(self):
+        self.orders = {}
+        self.positions = []
+        self.next_id = 0
+        self.reject = set()  # order types to reject, e.g. reduce-only orders on a flat position
+        self.calls = []  # (method, params) of every fetch/cancel/list call
+
+    def _algo(self, method, params):
+        self.calls.append((method, params))
+        return params.get("trigger") is True
+
+    async def create_order(self, symbol, order_type, side, quantity, price=None, params={}):
+        if order_type in self.reject:
+            raise Exception("ReduceOnly Order is rejected")
+        self.next_id += 1
+        order = {"id": str(self.next_id), "type": order_type, "side": side, "amount": quantity,
+                 "status": "open", "stopPrice": params["stopPrice"],
+                 "clientOrderId": params["clientOrderId"], "reduceOnly": params["reduceOnly"]}
+        self.orders[order["id"]] = order
+        return order
+
+    async def cancel_order(self, order_id, symbol, params={}):
+        if not self._algo("cancel_order", params):
+            raise Exception(f"OrderNotFound {order_id}")
+        self.orders[order_id]["status"] = "canceled"
+        return self.orders[order_id]
+
+    async def fetch_order(self, order_id, symbol, params={}):
+        if not self._algo("fetch_order", params):
+            raise Exception(f"OrderNotFound {order_id}")
+        return self.orders[order_id]
+
+    async def fetch_open_orders(self, symbol, since=None, limit=None, params={}):
+        if not self._algo("fetch_open_orders", params):
+            return []
+        return [o for o in self.orders.values() if o["status"] == "open"]
+
+    async def fetch_positions(self, symbols):
+        return self.positions
+
+    async def fetch_ticker(self, symbol):
+        return {"last": "2648"}
+
+    async def close(self):
+        pass
+
+    def open_of_type(self, order_type):
+        return [o for o in self.orders.values() if o["status"] == "open" and o["type"] == order_type]
+
+@pytest.mark.asyncio
+async def test_open_places_reduce_only_orders():
+    exchange = DummyExchange()
+    manager = ProtectiveExitManager(exchange, MathematicalStrategyCore())
+    await manager.open("short", 2650, 0.03, atr=10)
+    stop = exchange.open_of_type("STOP_MARKET")[0]
+    take_profit = exchange.open_of_type("TAKE_PROFIT_MARKET")[0]
+    assert stop["stopPrice"] == 2653 and stop["side"] == "BUY" and stop["reduceOnly"]
+    assert take_profit["stopPrice"] == 2645
+
+@pytest.mark.asyncio
+async def test_amend_replaces_only_moved_triggers():
+    exchange = DummyExchange()
+    manager = ProtectiveExitManager(exchange, MathematicalStrategyCore())
+    await manager.open("short", 2650, 0.03, atr=10)
+    assert not await manager.amend(10.5)
+    assert await manager.amend(20)
+    assert [o["stopPrice"] for o in exchange.open_of_type("STOP_MARKET")] == [2656]
+    assert [o["stopPrice"] for o in exchange.open_of_type("TAKE_PROFIT_MARKET")] == [2640]
+
+@pytest.mark.asyncio
+async def test_fill_cancels_sibling():
+    exchange = DummyExchange()
+    manager = ProtectiveExitManager(exchange, MathematicalStrategyCore())
+    await manager.open("short", 2650, 0.03, atr=10)
+    assert await manager.check_fills() is None
+    stop = exchange.open_of_type("STOP_MARKET")[0]
+    stop.update(status="closed", average=2653.5)
+    fill = await manager.check_fills()
+    assert fill == {"kind": "stop", "price": 2653.5}
+    assert exchange.open_of_type("TAKE_PROFIT_MARKET") == []
+
+@pytest.mark.asyncio
+async def test_reconcile_after_restart():
+    exchange = DummyExchange()
+    await ProtectiveExitManager(exchange, MathematicalStrategyCore()).open("long", 2650, 0.03, atr=10)
+    exchange.open_of_type("TAKE_PROFIT_MARKET")[0]["status"] = "canceled"
+    exchange.positions = [{"side": "long", "entryPrice": "2650", "contracts": 0.03}]
+
+    manager = ProtectiveExitManager(exchange, MathematicalStrategyCore())
+    position = await manager.reconcile(atr=10)
+    assert position["signal"] == "long" and position["stop_price"] == 2647
+    assert len(exchange.open_of_type("STOP_MARKET")) == 1
+    assert exchange.open_of_type("TAKE_PROFIT_MARKET")[0]["stopPrice"] == 2655
+
+    exchange.positions = []
+    assert await manager.reconcile(atr=10) is None
+    assert exchange.open_of_type("STOP_MARKET") == []
+
+@pytest.mark.asyncio
+async def test_take_profit_fill_booked_when_stop_expired():
+    exchange = DummyExchange()
+    manager = ProtectiveExitManager(exchange, MathematicalStrategyCore())
+    await manager.open("short", 2650, 0.03, atr=10)
+    exchange.open_of_type("STOP_MARKET")[0]["status"] = "expired"
+    exchange.open_of_type("TAKE_PROFIT_MARKET")[0].update(status="closed", average=2645)
+    exchange.reject = {"STOP_MARKET", "TAKE_PROFIT_MARKET"}
+    assert await manager.check_fills() == {"kind": "take_profit", "price": 2645}
+    assert manager.position is None
+
+@pytest.mark.asyncio
+async def test_missing_orders_replaced_only_while_position_open():
+    exchange = DummyExchange()
+    manager = ProtectiveExitManager(exchange, MathematicalStrategyCore())
+    await manager.open("short", 2650, 0.03, atr=10)
+    exchange.positions = [{"side": "short", "entryPrice": "2650", "contracts": 0.03}]
+    exchange.open_of_type("STOP_MARKET")[0]["status"] = "canceled"
+    assert await manager.check_fills() is None
+    assert exchange.open_of_type("STOP_MARKET")[0]["stopPrice"] == 2653
+
+    exchange.positions = []
+    exchange.open_of_type("STOP_MARKET")[0]["status"] = "canceled"
+    assert await manager.check_fills() == {"kind": "external", "price": 2648}
+    assert exchange.open_of_type("TAKE_PROFIT_MARKET") == []
+
+@pytest.mark.asyncio
+async def test_rejected_open_cancels_sibling():
+    exchange = DummyExchange()
+    exchange.reject = {"STOP_MARKET"}
+    manager = ProtectiveExitManager(exchange, MathematicalStrategyCore())
+    with pytest.raises(Exception):
+        await manager.open("short", 2650, 0.03, atr=10)
+    assert manager.position is None and manager.orders == {}
+    assert exchange.open_of_type("TAKE_PROFIT_MARKET") == []
+
+@pytest.mark.asyncio
+async def test_amend_places_orders_missing_after_reconcile():
+    exchange = DummyExchange()
+    exchange.positions = [{"side": "short", "entryPrice": "2650", "contracts": 0.03}]
+    manager = ProtectiveExitManager(exchange, MathematicalStrategyCore())
+    await manager.reconcile(atr=None)
+    assert await manager.amend(10)
+    assert exchange.open_of_type("STOP_MARKET")[0]["stopPrice"] == 2653
+    assert exchange.open_of_type("TAKE_PROFIT_MARKET")[0]["stopPrice"] == 2645
+
+@pytest.mark.asyncio
+async def test_order_calls_target_algo_endpoint():
+    exchange = DummyExchange()
+    manager = ProtectiveExitManager(exchange, MathematicalStrategyCore())
+    await manager.open("short", 2650, 0.03, atr=10)
+    await manager.amend(20)
+    exchange.open_of_type("STOP_MARKET")[0].update(status="closed", average=2656)
+    await manager.check_fills()
+    exchange.positions = []
+    await manager.reconcile(atr=10)
+    assert {method for method, _ in exchange.calls} == {"cancel_order", "fetch_order", "fetch_open_orders"}
+    assert all(params.get("trigger") is True for _, params in exchange.calls)
+
+@pytest.mark.asyncio
+async def test_bot_books_fill_before_amend_interval(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    bot = ScalpingBot("dummy", "dummy")
+    exchange = DummyExchange()
+    bot.exchange = exchange
+    bot.protective_exits = ProtectiveExitManager(exchange, bot.strategy_core)
+    bot.protective_fill_check = 0.01
+    bot.protective_refresh = 60
+    try:
+        await bot.protective_exits.open("short", 2650, 0.03, atr=10)
+        bot.current_trade = {"price": 2650, "quantity": 0.03, "signal": "short", "status": "open"}
+        task = asyncio.create_task(bot.manage_protective_exits())
+        exchange.open_of_type("STOP_MARKET")[0].update(status="closed", average=2653)
+        await asyncio.wait_for(task, timeout=1)
+        assert bot.current_trade is None
+        assert bot.performance_summary()["trades"] == 1
+    finally:
+        await bot.close()
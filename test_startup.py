@@ -0,0 +1,38 @@
+import json
+import os
+import subprocess
+import sys
+
+STARTUP_BUDGET_MS = float(os.getenv("STARTUP_BUDGET_MS", "1500"))
+
+def test_startup_budget(tmp_path):
+    main_py = os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py")
+    out = subprocess.run(
+        [sys.executable, main_py, "--profile-startup"],
+        cwd=tmp_path, capture_output=True, text=True, check=True,
+    )
+    profile = json.loads(out.stdout)
+    # Only the binance exchange and ccxt's base classes are loaded, not every exchange
+    assert profile["ccxt_modules"] < 50
+    assert profile["total_ms"] < STARTUP_BUDGET_MS
+
+def test_hollow_ccxt_namespace():
+    code = (
+        "import sys\n"
+        "from exchange_loader import load_binance\n"
+        "load_binance()\n"
+        "import ccxt\n"
+        "from ccxt.base.errors import BaseError\n"
+        "assert ccxt.BaseError is BaseError and 'BaseError' in vars(ccxt)\n"
+        "from ccxt.async_support import binance\n"
+        "assert isinstance(binance, type)\n"
+        "assert not hasattr(ccxt, '__file__') and not hasattr(ccxt, '__all__')\n"
+        "assert ccxt.__version__\n"
+        "try:\n"
+        "    ccxt.exchanges\n"
+        "except AttributeError:\n"
+        "    pass\n"
+        "else:\n"
+        "    sys.exit('ccxt.exchanges should not resolve on the hollow package')\n"
+    )
+    subprocess.run([sys.executable, "-c", code], cwd=os.path.dirname(os.path.abspath(__file__)), check=True)
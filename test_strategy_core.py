@@ -14,4 +14,11 @@ def test_atr():
     lows = [9, 10, 11, 12, 13, 14, 15, 16, 17, 18, 19, 20, 21, 22, 23]
     closes = [9.5, 10.5, 11.5, 12.5, 13.5, 14.5, 15.5, 16.5, 17.5, 18.5, 19.5, 20.5, 21.5, 22.5, 23.5]
     atr = core.compute_atr(highs, lows, closes, window=14)
-    assert atr is not None
\ No newline at end of file
+    assert atr is not None
+
+def test_protective_levels():
+    core = MathematicalStrategyCore()
+    stop, take_profit = core.protective_levels(2650, 10, side="short")
+    assert stop == 2653 and take_profit == 2645
+    stop, take_profit = core.protective_levels(2650, 10, side="long")
+    assert stop == 2647 and take_profit == 2655
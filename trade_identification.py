@@ -1,5 +1,4 @@
 import asyncio
-import ccxt.async_support as ccxt
 import numpy as np
 from collections import deque
 from datetime import datetime, timedelta